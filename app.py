@@ -1,6 +1,7 @@
 import streamlit as st
 import uuid
-from rag_utils import query_rag
+import itertools
+from rag_utils import stream_rag
 
 # Set page config (no sidebar layout)
 st.set_page_config(page_title="RAG Chat Assistant", page_icon="🤖", layout="wide")
@@ -56,7 +57,9 @@ if prompt := st.chat_input("What's your question?"):
         st.markdown(prompt)
 
     with st.chat_message("assistant"):
+        # Spinner covers retrieval and prefill; tokens then render as they arrive
+        stream = stream_rag(prompt, st.session_state.session_id)
         with st.spinner("Thinking..."):
-            response = query_rag(prompt, st.session_state.session_id)
-        st.markdown(response)
+            first_chunk = next(stream, "")
+        response = st.write_stream(itertools.chain([first_chunk], stream))
         st.session_state.messages.append({"role": "assistant", "content": response})
\ No newline at end of file
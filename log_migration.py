@@ -0,0 +1,35 @@
+import os
+import json
+
+# Legacy JSON-array files and the JSON Lines files that replaced them
+LEGACY_LOG_FILES = {
+    "chat_logs.json": "chat_logs.jsonl",
+    "admin_logs.json": "admin_logs.jsonl",
+    "metrics.json": "metrics.jsonl",
+}
+
+
+def migrate_json_log(legacy_path, path):
+    """
+    One-shot conversion of a legacy JSON-array log file into JSON Lines.
+    Runs while the JSON Lines file is missing or empty; the legacy file is left
+    in place so existing checkouts keep their tracked copy.
+    """
+    if not os.path.exists(legacy_path):
+        return
+    if os.path.exists(path) and os.path.getsize(path) > 0:
+        return
+    try:
+        with open(legacy_path, 'r', encoding='utf-8') as f:
+            content = f.read().strip()
+        logs = json.loads(content) if content else []
+    except (json.JSONDecodeError, IOError):
+        return
+    with open(path, 'w', encoding='utf-8') as f:
+        f.writelines(json.dumps(entry) + "\n" for entry in logs)
+
+
+def migrate_logs(base_dir="."):
+    """Convert every legacy log in base_dir; called by the app and the viewer pages."""
+    for legacy_name, name in LEGACY_LOG_FILES.items():
+        migrate_json_log(os.path.join(base_dir, legacy_name), os.path.join(base_dir, name))
@@ -3,6 +3,7 @@ import os
 import json
 import toml
 import subprocess
+import importlib.util
 import streamlit_authenticator as stauth
 from rag_utils import ingest_documents, load_blocked_terms, save_blocked_terms, log_admin_activity
 
@@ -13,11 +14,12 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 CRED_FILE = os.path.join(BASE_DIR, "..", "credentials.toml")
 DOCUMENTS_DIR = os.path.join(BASE_DIR, "..", "documents")
 CONFIG_FILE = os.path.join(BASE_DIR, "..", "config.json")
-CHAT_LOGS_FILE = os.path.join(BASE_DIR, "..", "chat_logs.json")
-ADMIN_LOGS_FILE = os.path.join(BASE_DIR, "..", "admin_logs.json")
+CHAT_LOGS_FILE = os.path.join(BASE_DIR, "..", "chat_logs.jsonl")
+ADMIN_LOGS_FILE = os.path.join(BASE_DIR, "..", "admin_logs.jsonl")
 os.makedirs(DOCUMENTS_DIR, exist_ok=True)
 
 # -------------------- Helper: get Ollama models --------------------
+@st.cache_data(ttl=60, show_spinner=False)
 def get_installed_ollama_models():
     try:
         result = subprocess.run(
@@ -34,8 +36,24 @@ def get_installed_ollama_models():
         print("Error fetching Ollama models:", e)
         return []
 
+# -------------------- Helper: cached file loads --------------------
+# Keyed on the file's mtime so edits invalidate the cache on the next rerun
+@st.cache_data(show_spinner=False)
+def load_credentials(mtime):
+    return toml.load(CRED_FILE)
+
+@st.cache_data(show_spinner=False)
+def load_model_config(mtime):
+    with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+@st.cache_data(ttl=5, show_spinner=False)
+def list_documents(mtime):
+    with os.scandir(DOCUMENTS_DIR) as it:
+        return sorted(e.name for e in it if e.is_file())
+
 # -------------------- Load credentials --------------------
-config = toml.load(CRED_FILE)
+config = load_credentials(os.path.getmtime(CRED_FILE))
 authenticator = stauth.Authenticate(
     credentials=config["credentials"],
     cookie_name="RAG_Admin",
@@ -98,7 +116,7 @@ elif auth_status:
 
     # -------------------- Current Documents --------------------
     st.subheader("Current Documents")
-    docs = os.listdir(DOCUMENTS_DIR)
+    docs = list_documents(os.path.getmtime(DOCUMENTS_DIR))
     if docs:
         for doc in docs:
             st.write(f"- {doc}")
@@ -124,8 +142,7 @@ elif auth_status:
     # -------------------- Configure Models --------------------
     st.subheader("Configure Models")
     if os.path.exists(CONFIG_FILE):
-        with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-            model_config = json.load(f)
+        model_config = load_model_config(os.path.getmtime(CONFIG_FILE))
     else:
         model_config = {"generation_model": "gemma2:9b", "embedding_model": "nomic-embed-text"}
 
@@ -144,6 +161,9 @@ elif auth_status:
     )
 
     emb_options = ["nomic-embed-text", "mxbai-embed-large"]
+    # "fastembed:" models run locally via FastEmbed, an optional install
+    if importlib.util.find_spec("fastembed") is not None:
+        emb_options.append("fastembed:sentence-transformers/all-MiniLM-L6-v2")
     current_emb_model = model_config.get("embedding_model", emb_options[0])
     if current_emb_model not in emb_options:
         current_emb_model = emb_options[0]
@@ -160,4 +180,6 @@ elif auth_status:
         with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
             json.dump(model_config, f, indent=4)
         st.success(f"Updated models: Generation={gen_model}, Embedding={emb_model}")
+        if emb_model != current_emb_model:
+            st.info("Embedding model changed. Run the ingestion process to rebuild the vector store.")
         log_admin_activity("update_models", username, details=f"Generation: {gen_model}, Embedding: {emb_model}")
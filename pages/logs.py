@@ -2,14 +2,35 @@ import streamlit as st
 import os
 import json
 import toml
+from collections import deque
 import streamlit_authenticator as stauth
+from log_migration import migrate_logs
 
 st.set_page_config(page_title="RAG Admin Logs", layout="wide")
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 CRED_FILE = os.path.join(BASE_DIR, "..", "credentials.toml")
-CHAT_LOGS_FILE = os.path.join(BASE_DIR, "..", "chat_logs.json")
-ADMIN_LOGS_FILE = os.path.join(BASE_DIR, "..", "admin_logs.json")
+CHAT_LOGS_FILE = os.path.join(BASE_DIR, "..", "chat_logs.jsonl")
+ADMIN_LOGS_FILE = os.path.join(BASE_DIR, "..", "admin_logs.jsonl")
+
+# Convert legacy .json logs when this page is the first one the server runs
+migrate_logs(os.path.join(BASE_DIR, ".."))
+
+# -------------------- Helper: read log tail --------------------
+# JSON Lines: only the last `limit` lines are read into memory. Cached briefly
+# and keyed on mtime so reruns don't re-read an unchanged file.
+@st.cache_data(ttl=5, show_spinner=False)
+def read_recent_logs(path, mtime, limit=50):
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = deque(f, maxlen=limit)
+    entries = []
+    for line in lines:
+        try:
+            entries.append(json.loads(line))
+        except json.JSONDecodeError:
+            continue
+    return entries
+
 
 config = toml.load(CRED_FILE)
 authenticator = stauth.Authenticate(
@@ -38,9 +59,7 @@ elif auth_status:
     # Chat logs
     with tabs[0]:
         if os.path.exists(CHAT_LOGS_FILE):
-            with open(CHAT_LOGS_FILE, 'r', encoding='utf-8') as f:
-                logs = json.load(f)
-            for entry in reversed(logs[-50:]):
+            for entry in reversed(read_recent_logs(CHAT_LOGS_FILE, os.path.getmtime(CHAT_LOGS_FILE))):
                 st.json(entry)
         else:
             st.info("No chat logs found.")
@@ -48,9 +67,7 @@ elif auth_status:
     # Admin logs
     with tabs[1]:
         if os.path.exists(ADMIN_LOGS_FILE):
-            with open(ADMIN_LOGS_FILE, 'r', encoding='utf-8') as f:
-                logs = json.load(f)
-            for entry in reversed(logs[-50:]):
+            for entry in reversed(read_recent_logs(ADMIN_LOGS_FILE, os.path.getmtime(ADMIN_LOGS_FILE))):
                 st.json(entry)
         else:
             st.info("No admin logs found.")
@@ -1,15 +1,62 @@
 import os
-import json
+import io
 import streamlit as st
 import toml
 import streamlit_authenticator as stauth
+from log_migration import migrate_logs
 import pandas as pd
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 
 # -------------------- Paths --------------------
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 CRED_FILE = os.path.join(BASE_DIR, "..", "credentials.toml")
-METRICS_FILE = os.path.join(BASE_DIR, "..", "metrics.json")
+METRICS_FILE = os.path.join(BASE_DIR, "..", "metrics.jsonl")
+
+# Convert legacy .json logs when this page is the first one the server runs
+migrate_logs(os.path.join(BASE_DIR, ".."))
+
+# -------------------- Helper: load metrics --------------------
+# Metrics are JSON Lines; keyed on mtime so new ingestion runs show up
+@st.cache_data(ttl=30, show_spinner=False)
+def load_metrics(mtime):
+    if os.path.getsize(METRICS_FILE) == 0:
+        return pd.DataFrame()
+    return pd.read_json(METRICS_FILE, lines=True)
+
+# Charts are rendered once per metrics file change to PNG bytes, which can be
+# shared between sessions safely. Figure is used directly rather than pyplot,
+# whose global state isn't thread-safe across Streamlit script threads.
+def _render_png(fig):
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", bbox_inches="tight")
+    return buffer.getvalue()
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def build_charts(mtime):
+    df = load_metrics(mtime)
+
+    fig1 = Figure()
+    ax1 = fig1.subplots()
+    df.plot(x="timestamp", y="total_chunks", marker="o", ax=ax1)
+    for label in ax1.get_xticklabels():
+        label.set(rotation=45, ha="right")
+
+    fig2 = Figure()
+    ax2 = fig2.subplots()
+    df.plot(x="timestamp", y=["avg_chunk_size_chars", "max_chunk_size_chars"], marker="o", ax=ax2)
+    for label in ax2.get_xticklabels():
+        label.set(rotation=45, ha="right")
+
+    return _render_png(fig1), _render_png(fig2)
+
+@st.cache_data(show_spinner=False)
+def summarize_metrics(mtime):
+    df = load_metrics(mtime)
+    return {
+        "runs": len(df),
+        "avg_chunks": df["total_chunks"].mean(),
+        "avg_chunk_size": df["avg_chunk_size_chars"].mean(),
+    }
 
 # -------------------- Load credentials --------------------
 config = toml.load(CRED_FILE)
@@ -41,34 +88,30 @@ elif auth_status:
     if not os.path.exists(METRICS_FILE):
         st.info("No metrics found yet. Run document ingestion first.")
     else:
-        with open(METRICS_FILE, "r", encoding="utf-8") as f:
-            metrics_data = json.load(f)
+        mtime = os.path.getmtime(METRICS_FILE)
+        df = load_metrics(mtime)
 
-        if not metrics_data:
+        if df.empty:
             st.info("Metrics file is empty.")
         else:
-            df = pd.DataFrame(metrics_data)
 
             # Show raw metrics table
             st.subheader("Raw Metrics Data")
             st.dataframe(df)
 
+            chart1, chart2 = build_charts(mtime)
+
             # Plot: Chunks over time
             st.subheader("Chunks Created Over Time")
-            fig1, ax1 = plt.subplots()
-            df.plot(x="timestamp", y="total_chunks", marker="o", ax=ax1)
-            plt.xticks(rotation=45, ha="right")
-            st.pyplot(fig1)
+            st.image(chart1)
 
             # Plot: Average vs Max chunk size
             st.subheader("Average & Max Chunk Sizes")
-            fig2, ax2 = plt.subplots()
-            df.plot(x="timestamp", y=["avg_chunk_size_chars", "max_chunk_size_chars"], marker="o", ax=ax2)
-            plt.xticks(rotation=45, ha="right")
-            st.pyplot(fig2)
+            st.image(chart2)
 
             # Summary stats
+            summary = summarize_metrics(mtime)
             st.subheader("Summary")
-            st.write(f"**Total ingestion runs:** {len(df)}")
-            st.write(f"**Average chunks per run:** {df['total_chunks'].mean():.2f}")
-            st.write(f"**Average chunk size (chars):** {df['avg_chunk_size_chars'].mean():.2f}")
+            st.write(f"**Total ingestion runs:** {summary['runs']}")
+            st.write(f"**Average chunks per run:** {summary['avg_chunks']:.2f}")
+            st.write(f"**Average chunk size (chars):** {summary['avg_chunk_size']:.2f}")
@@ -1,31 +1,97 @@
 import os
 import json
+import atexit
+import hashlib
+import itertools
+import queue
+import threading
+import time
 import warnings
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from uuid import uuid4
+
+from log_migration import migrate_logs
 
 from langchain_ollama import OllamaLLM, OllamaEmbeddings
 from langchain.chains import RetrievalQA
 from langchain_chroma import Chroma
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder, format_document
 
 # Advanced loaders and splitters
 from langchain_community.document_loaders import TextLoader
 from langchain_community.document_loaders import UnstructuredFileLoader
-from langchain_experimental.text_splitter import SemanticChunker
+from langchain_experimental.text_splitter import (
+    SemanticChunker,
+    calculate_cosine_distances,
+    combine_sentences,
+)
 from langchain.text_splitter import RecursiveCharacterTextSplitter, TokenTextSplitter
 from langchain.retrievers import ParentDocumentRetriever
 
+# Optional: single-pass multi-pattern matching for the blocked-term filter
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 # Suppress PDF warnings
 warnings.filterwarnings("ignore", category=DeprecationWarning, module="PyPDF2")
 
 # -------------------- File Paths --------------------
 BLOCKED_FILE = "blocked_terms.json"
-LOGS_FILE = "chat_logs.json"
-ADMIN_LOGS_FILE = "admin_logs.json"
+LOGS_FILE = "chat_logs.jsonl"
+ADMIN_LOGS_FILE = "admin_logs.jsonl"
+METRICS_FILE = "metrics.jsonl"
 CONFIG_FILE = "config.json"
+INGEST_MANIFEST_FILE = "ingest_manifest.json"
+
+FASTEMBED_PREFIX = "fastembed:"
+
+# .txt is read with TextLoader; every other extension goes through Unstructured
+SUPPORTED_EXTENSIONS = ('.txt', '.pdf', '.docx', '.pptx')
+
+BLOCKED_MESSAGE = "Sorry, that query is not allowed. Please ask something else."
+
+# Number of chunks sent to the embedding model per request during ingestion
+EMBED_BATCH_SIZE = 64
+
+# Set SEMANTIC=0 to use the plain character splitter instead of SemanticChunker,
+# which embeds every sentence of every document during ingestion
+SEMANTIC_ENABLED = os.getenv("SEMANTIC", "1") == "1"
+
+# Keep models resident in Ollama between queries (-1 = never unload).
+# Set OLLAMA_WARMUP=0 to skip loading them in the background on import.
+OLLAMA_KEEP_ALIVE = -1
+OLLAMA_WARMUP = os.getenv("OLLAMA_WARMUP", "1") == "1"
+
+# -------------------- In-memory Caches --------------------
+# Parsed files are keyed on their (mtime, size) signature so edits made from
+# the admin panel are picked up without re-reading disk on every query.
+# The config is stored as one (signature, config) pair so readers never see
+# a signature from one read alongside the config from another.
+_CONFIG_CACHE = {"entry": None}
+_BLOCKED_CACHE = {"signature": None, "terms": [], "lower": [], "automaton": None}
+_RAG_CACHE = {"signature": None, "chains": {}}
+_RAG_LOCK = threading.Lock()
+# One Chroma client shared by the query and ingest paths
+_DB = {"embedding_model": None, "db": None}
+_DB_LOCK = threading.Lock()
+_PRINT_LOCK = threading.Lock()
+# Shared workers for the I/O overlapped with each query
+_QUERY_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="query")
+
+
+def _file_signature(path):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
 
 
 # -------------------- Config --------------------
-def load_config():
+def _load_config_entry():
+    """Return (signature, config) for config.json, re-reading it only on change."""
     if not os.path.exists(CONFIG_FILE):
         default_config = {
             "generation_model": "gemma2:9b",
@@ -33,33 +99,125 @@ def load_config():
         }
         with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
             json.dump(default_config, f, indent=4)
-        return default_config
-    with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-        return json.load(f)
+
+    signature = _file_signature(CONFIG_FILE)
+    entry = _CONFIG_CACHE["entry"]
+    if entry is None or entry[0] != signature:
+        with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+            entry = (signature, json.load(f))
+        _CONFIG_CACHE["entry"] = entry
+    return entry
+
+
+def load_config():
+    return dict(_load_config_entry()[1])
 
 
 # -------------------- Blocked Terms --------------------
-def load_blocked_terms():
+def _set_blocked_terms(terms, signature):
+    _BLOCKED_CACHE["terms"] = list(terms)
+    # Lowercased once per file change rather than once per query
+    _BLOCKED_CACHE["lower"] = [term.lower() for term in terms if term]
+    _BLOCKED_CACHE["automaton"] = None
+    if ahocorasick is not None and _BLOCKED_CACHE["lower"]:
+        automaton = ahocorasick.Automaton()
+        for term in _BLOCKED_CACHE["lower"]:
+            automaton.add_word(term, term)
+        automaton.make_automaton()
+        _BLOCKED_CACHE["automaton"] = automaton
+    _BLOCKED_CACHE["signature"] = signature
+
+
+def _refresh_blocked_terms():
     if not os.path.exists(BLOCKED_FILE):
         with open(BLOCKED_FILE, 'w', encoding='utf-8') as f:
             json.dump([], f)
-        return []
-    with open(BLOCKED_FILE, 'r', encoding='utf-8') as f:
-        return json.load(f)
+        _set_blocked_terms([], _file_signature(BLOCKED_FILE))
+        return
+
+    signature = _file_signature(BLOCKED_FILE)
+    if signature != _BLOCKED_CACHE["signature"]:
+        with open(BLOCKED_FILE, 'r', encoding='utf-8') as f:
+            _set_blocked_terms(json.load(f), signature)
+
+
+def load_blocked_terms():
+    _refresh_blocked_terms()
+    return list(_BLOCKED_CACHE["terms"])
 
 
 def save_blocked_terms(terms):
     with open(BLOCKED_FILE, 'w', encoding='utf-8') as f:
         json.dump(terms, f, indent=4)
+    _set_blocked_terms(terms, _file_signature(BLOCKED_FILE))
 
 
 def check_blocked(query):
-    blocked_terms = load_blocked_terms()
+    _refresh_blocked_terms()
     query_lower = query.lower()
-    return any(term.lower() in query_lower for term in blocked_terms)
+    automaton = _BLOCKED_CACHE["automaton"]
+    if automaton is not None:
+        for _ in automaton.iter(query_lower):
+            return True
+        return False
+    return any(term in query_lower for term in _BLOCKED_CACHE["lower"])
 
 
 # -------------------- Logging --------------------
+# Logs are JSON Lines: one entry per line, so writing a log is a single append.
+# Entries are queued and written by a background thread in small batches, which
+# keeps file I/O off the query path.
+LOG_FLUSH_INTERVAL = 0.1  # seconds
+_LOG_QUEUE = queue.Queue()
+
+
+def _write_log_batch(batch):
+    lines_by_path = {}
+    for path, line in batch:
+        lines_by_path.setdefault(path, []).append(line)
+    for path, lines in lines_by_path.items():
+        try:
+            with open(path, 'a', encoding='utf-8') as f:
+                f.writelines(lines)
+        except Exception as e:
+            print(f"Error writing {path}: {str(e)}")
+
+
+def _drain_logs():
+    while True:
+        batch = [_LOG_QUEUE.get()]
+        time.sleep(LOG_FLUSH_INTERVAL)
+        while True:
+            try:
+                batch.append(_LOG_QUEUE.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            _write_log_batch(batch)
+        except Exception as e:
+            # Never let a failed write stop the only writer thread
+            print(f"Error writing logs: {str(e)}")
+        finally:
+            for _ in batch:
+                _LOG_QUEUE.task_done()
+
+
+def flush_logs():
+    """Block until every queued log entry has been written."""
+    if _LOG_THREAD.is_alive():
+        _LOG_QUEUE.join()
+
+
+def _append_log(path, entry):
+    # Serialized here so bad entries raise at the call site, not in the writer
+    _LOG_QUEUE.put((path, json.dumps(entry) + "\n"))
+
+
+_LOG_THREAD = threading.Thread(target=_drain_logs, name="log-writer", daemon=True)
+_LOG_THREAD.start()
+atexit.register(flush_logs)
+
+
 def log_query(query, response, session_id):
     timestamp = datetime.now().isoformat()
     log_entry = {
@@ -68,21 +226,19 @@ def log_query(query, response, session_id):
         "response": response,
         "session_id": session_id
     }
+    _append_log(LOGS_FILE, log_entry)
 
-    logs = []
-    if os.path.exists(LOGS_FILE):
-        try:
-            with open(LOGS_FILE, 'r', encoding='utf-8') as f:
-                content = f.read().strip()
-                if content:
-                    logs = json.loads(content)
-        except (json.JSONDecodeError, IOError):
-            logs = []
-
-    logs.append(log_entry)
 
-    with open(LOGS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(logs, f, indent=4)
+def log_ingestion_metrics(documents, file_count):
+    sizes = [len(d.page_content) for d in documents]
+    metrics_entry = {
+        "timestamp": datetime.now().isoformat(),
+        "files_processed": file_count,
+        "total_chunks": len(sizes),
+        "avg_chunk_size_chars": sum(sizes) / len(sizes) if sizes else 0,
+        "max_chunk_size_chars": max(sizes, default=0)
+    }
+    _append_log(METRICS_FILE, metrics_entry)
 
 
 def log_admin_activity(action, username, details=None):
@@ -93,50 +249,121 @@ def log_admin_activity(action, username, details=None):
         "username": username,
         "details": details or ""
     }
+    _append_log(ADMIN_LOGS_FILE, log_entry)
 
-    logs = []
-    if os.path.exists(ADMIN_LOGS_FILE):
-        try:
-            with open(ADMIN_LOGS_FILE, 'r', encoding='utf-8') as f:
-                content = f.read().strip()
-                if content:
-                    logs = json.loads(content)
-        except (json.JSONDecodeError, IOError):
-            logs = []
 
-    logs.append(log_entry)
-
-    with open(ADMIN_LOGS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(logs, f, indent=4)
+migrate_logs()
 
 
 # -------------------- Smarter Chunking --------------------
+class BatchedSemanticChunker(SemanticChunker):
+    """
+    SemanticChunker that embeds sentence groups across all documents in
+    batches of EMBED_BATCH_SIZE, instead of one embedding request per document.
+    Unstructured's "elements" mode yields many small documents, so the
+    per-document requests otherwise dominate ingestion time.
+    """
+
+    _local = threading.local()
+
+    def _combined_sentences(self, text):
+        single_sentences_list = self._get_single_sentences_list(text)
+        # Mirrors split_text, which returns these texts without embedding them
+        if len(single_sentences_list) == 1 or (
+            self.breakpoint_threshold_type == "gradient" and len(single_sentences_list) == 2
+        ):
+            return []
+        _sentences = [
+            {"sentence": x, "index": i} for i, x in enumerate(single_sentences_list)
+        ]
+        return combine_sentences(_sentences, self.buffer_size)
+
+    def create_documents(self, texts, metadatas=None):
+        # Embed all sentence groups up front; split_text then reads from the cache
+        pending = list(dict.fromkeys(
+            s["combined_sentence"]
+            for text in texts
+            for s in self._combined_sentences(text)
+        ))
+        cache = {}
+        for i in range(0, len(pending), EMBED_BATCH_SIZE):
+            batch = pending[i:i + EMBED_BATCH_SIZE]
+            cache.update(zip(batch, self.embeddings.embed_documents(batch)))
+
+        self._local.cache = cache
+        try:
+            return super().create_documents(texts, metadatas=metadatas)
+        finally:
+            self._local.cache = None
+
+    def _calculate_sentence_distances(self, single_sentences_list):
+        sentences = combine_sentences(
+            [{"sentence": x, "index": i} for i, x in enumerate(single_sentences_list)],
+            self.buffer_size,
+        )
+        cache = getattr(self._local, "cache", None) or {}
+        missing = [s["combined_sentence"] for s in sentences if s["combined_sentence"] not in cache]
+        if missing:
+            cache = {**cache, **dict(zip(missing, self.embeddings.embed_documents(missing)))}
+        for sentence in sentences:
+            sentence["combined_sentence_embedding"] = cache[sentence["combined_sentence"]]
+        return calculate_cosine_distances(sentences)
+
+
 def get_hierarchical_splitter(embeddings):
     """
     Hierarchical semantic splitter:
-    1. Try semantic breakpoints (embedding-based).
-    2. Fallback: token-based to avoid cutting tokens.
-    3. Last fallback: recursive character splitter.
+    1. Try semantic breakpoints (embedding-based, batched across documents).
+    2. Fallback: recursive character splitter sized for the embedding model's
+       context window, used when SEMANTIC=0 or the semantic chunker fails.
     """
-    try:
-        return SemanticChunker(embeddings, breakpoint_threshold_type="percentile")
-    except Exception:
-        # Fallback hybrid
-        return RecursiveCharacterTextSplitter(
-            separators=["\n\n", "\n", ". ", " "],
-            chunk_size=1000,
-            chunk_overlap=150,
-            length_function=len,
-            is_separator_regex=False
-        )
+    if SEMANTIC_ENABLED:
+        try:
+            return BatchedSemanticChunker(embeddings, breakpoint_threshold_type="percentile")
+        except Exception:
+            pass
+    # nomic-embed-text accepts ~8k tokens, so larger chunks avoid oversplitting
+    return RecursiveCharacterTextSplitter(
+        separators=["\n\n", "\n", ". ", " "],
+        chunk_size=2048,
+        chunk_overlap=256,
+        length_function=len,
+        is_separator_regex=False
+    )
 
 
 # -------------------- RAG --------------------
-def load_rag():
-    config = load_config()
-    embeddings = OllamaEmbeddings(model=config["embedding_model"])
-    db = Chroma(persist_directory="./chroma_db", embedding_function=embeddings)
-    llm = OllamaLLM(model=config["generation_model"])
+def get_embeddings(embedding_model):
+    """
+    Embedding client for a configured model name.
+    "fastembed:<model>" runs the model locally through FastEmbed (quantized ONNX);
+    anything else is served by Ollama.
+    """
+    if embedding_model.startswith(FASTEMBED_PREFIX):
+        from langchain_community.embeddings.fastembed import FastEmbedEmbeddings
+        return FastEmbedEmbeddings(model_name=embedding_model[len(FASTEMBED_PREFIX):])
+    return OllamaEmbeddings(model=embedding_model)
+
+
+def get_db(embedding_model):
+    """
+    Return the shared Chroma vectorstore, so the SQLite connection and the
+    index stay open across queries and ingestion runs. It is only rebuilt when
+    the embedding model changes, since queries embed through its embeddings.
+    """
+    with _DB_LOCK:
+        if _DB["db"] is None or _DB["embedding_model"] != embedding_model:
+            _DB["db"] = Chroma(
+                persist_directory="./chroma_db",
+                embedding_function=get_embeddings(embedding_model),
+            )
+            _DB["embedding_model"] = embedding_model
+        return _DB["db"]
+
+
+def _build_rag(generation_model, embedding_model):
+    db = get_db(embedding_model)
+    llm = OllamaLLM(model=generation_model, keep_alive=OLLAMA_KEEP_ALIVE)
 
     # Parent-document retriever: children = fine-grained chunks, parents = larger context
     retriever = ParentDocumentRetriever(
@@ -148,52 +375,271 @@ def load_rag():
     return RetrievalQA.from_chain_type(llm=llm, chain_type="stuff", retriever=retriever)
 
 
+def load_rag():
+    """
+    Return the QA chain for the configured models.
+    The chain is built once per (generation_model, embedding_model) pair and
+    reused across queries; the cache is dropped whenever config.json changes.
+    """
+    signature, config = _load_config_entry()
+    key = (config["generation_model"], config["embedding_model"])
+    with _RAG_LOCK:
+        if signature != _RAG_CACHE["signature"]:
+            _RAG_CACHE["chains"].clear()
+            _RAG_CACHE["signature"] = signature
+        chains = _RAG_CACHE["chains"]
+        if key not in chains:
+            chains[key] = _build_rag(*key)
+        return chains[key]
+
+
+def _retrieve_by_vector(retriever, query_embedding):
+    # Same lookup as ParentDocumentRetriever, but from an already computed embedding
+    sub_docs = retriever.vectorstore.similarity_search_by_vector(
+        query_embedding, **retriever.search_kwargs
+    )
+    ids = list(dict.fromkeys(
+        d.metadata[retriever.id_key] for d in sub_docs if retriever.id_key in d.metadata
+    ))
+    return [d for d in retriever.docstore.mget(ids) if d is not None]
+
+
+def _start_query_embedding(query):
+    """
+    Start embedding the query in the background so it overlaps the blocked-term
+    check. Returns (embeddings, future), or None if the embedder can't be set up;
+    retrieval then embeds again and reports the error itself.
+    """
+    try:
+        embeddings = get_db(load_config()["embedding_model"]).embeddings
+        return embeddings, _QUERY_EXECUTOR.submit(embeddings.embed_query, query)
+    except Exception:
+        return None
+
+
+def _retrieve(qa, query, pending_embedding):
+    embeddings = qa.retriever.vectorstore.embeddings
+    # Reuse the background embedding unless the model changed in between
+    if pending_embedding is not None and pending_embedding[0] is embeddings:
+        query_embedding = pending_embedding[1].result()
+    else:
+        query_embedding = embeddings.embed_query(query)
+    return _retrieve_by_vector(qa.retriever, query_embedding)
+
+
+# -------------------- Chat Sessions --------------------
+# Each session's turns are kept server-side and only appended to, so every
+# prompt starts with the previous prompt's prefix (system prompt + history).
+# Ollama reuses its KV cache for that prefix and only prefills the new turn.
+SYSTEM_PROMPT = (
+    "Use the provided pieces of context to answer the user's question. "
+    "If you don't know the answer, just say that you don't know, "
+    "don't try to make up an answer."
+)
+CHAT_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", SYSTEM_PROMPT),
+    MessagesPlaceholder("history"),
+    ("human", "Context:\n{context}\n\nQuestion: {question}"),
+])
+MAX_SESSIONS = 100
+MAX_HISTORY_TURNS = 10
+_SESSIONS = OrderedDict()
+_SESSIONS_LOCK = threading.Lock()
+
+
+def _session_history(session_id):
+    with _SESSIONS_LOCK:
+        history = _SESSIONS.setdefault(session_id, [])
+        _SESSIONS.move_to_end(session_id)
+        while len(_SESSIONS) > MAX_SESSIONS:
+            _SESSIONS.popitem(last=False)
+        return history
+
+
+def _append_turn(history, query, response):
+    history.extend([HumanMessage(content=query), AIMessage(content=response)])
+    # Trim in halves rather than per turn, so the cached prefix only breaks occasionally
+    if len(history) > 2 * MAX_HISTORY_TURNS:
+        # Each turn is a Human/AI message pair; drop whole turns to keep them aligned
+        del history[:2 * max(1, MAX_HISTORY_TURNS // 2)]
+
+
 def query_rag(query, session_id):
+    return "".join(stream_rag(query, session_id))
+
+
+def stream_rag(query, session_id):
+    """
+    Answer a query within its chat session, yielding the answer token by token.
+    Documents are formatted like the "stuff" chain built in load_rag and sent
+    after the session history. The full response is logged once done.
+    """
+    pending_embedding = _start_query_embedding(query)
+    # Checked before anything that can fail, so blocked queries are always refused
     if check_blocked(query):
-        msg = "Sorry, that query is not allowed. Please ask something else."
-        log_query(query, msg, session_id)
-        return msg
-    qa = load_rag()
+        log_query(query, BLOCKED_MESSAGE, session_id)
+        yield BLOCKED_MESSAGE
+        return
+
+    chunks = []
     try:
-        response = qa.invoke({"query": query})["result"]
-        log_query(query, response, session_id)
-        return response
+        qa = load_rag()
+        docs = _retrieve(qa, query, pending_embedding)
+        stuff_chain = qa.combine_documents_chain
+        context = stuff_chain.document_separator.join(
+            format_document(doc, stuff_chain.document_prompt) for doc in docs
+        )
+        history = _session_history(session_id)
+        prompt = CHAT_PROMPT.format(history=history, context=context, question=query)
+        for chunk in stuff_chain.llm_chain.llm.stream(prompt):
+            chunks.append(chunk)
+            yield chunk
+        _append_turn(history, query, "".join(chunks))
     except Exception as e:
         err = f"Error querying RAG: {str(e)}"
-        log_query(query, err, session_id)
-        return err
+        chunks.append(err)
+        yield err
+    finally:
+        # Also runs when the consumer stops early (e.g. the user sends another
+        # message mid-answer), so every turn is logged with what was produced
+        log_query(query, "".join(chunks), session_id)
+
+
+def _warmup_models():
+    # Pays the model load into memory up front instead of on the first query
+    try:
+        config = load_config()
+        OllamaLLM(
+            model=config["generation_model"], keep_alive=OLLAMA_KEEP_ALIVE, num_predict=1
+        ).invoke(".")
+        get_db(config["embedding_model"]).embeddings.embed_query("warmup")
+    except Exception as e:
+        print(f"Error warming up models: {str(e)}")
+
+
+if OLLAMA_WARMUP:
+    threading.Thread(target=_warmup_models, name="model-warmup", daemon=True).start()
 
 
 # -------------------- Document Ingestion --------------------
+def _load_manifest():
+    if not os.path.exists(INGEST_MANIFEST_FILE):
+        return {"embedding_model": None, "files": {}}
+    try:
+        with open(INGEST_MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (json.JSONDecodeError, IOError):
+        return {"embedding_model": None, "files": {}}
+
+
+def _save_manifest(manifest):
+    with open(INGEST_MANIFEST_FILE, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=4)
+
+
+def _sha256(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _load_and_split(file_path, splitter):
+    """Return the cleaned chunks for one file, or None if it failed to split."""
+    file = os.path.basename(file_path)
+    extension = os.path.splitext(file)[1].lower()
+    if extension == '.txt':
+        loader = TextLoader(file_path)
+        docs = loader.load()
+    elif extension in SUPPORTED_EXTENSIONS:
+        # Everything else supported goes through Unstructured (PDF, Word, PowerPoint, ...)
+        loader = UnstructuredFileLoader(file_path, mode="elements")
+        docs = loader.load()
+    else:
+        return []
+
+    try:
+        split_docs = splitter.split_documents(docs)
+        for d in split_docs:
+            d.page_content = d.page_content.strip()
+        return split_docs
+    except Exception as e:
+        with _PRINT_LOCK:
+            print(f"Error processing {file}: {str(e)}")
+        return None
+
+
 def ingest_documents(folder_path="./documents"):
+    """
+    Ingest new or changed files from folder_path.
+    Files are tracked in the ingest manifest by (mtime, sha256); unchanged files
+    are skipped, and chunks of changed or deleted files are removed from Chroma.
+    Switching the embedding model changes the vector size, so the collection is
+    rebuilt from scratch in that case.
+    """
     config = load_config()
-    embeddings = OllamaEmbeddings(model=config["embedding_model"])
-    splitter = get_hierarchical_splitter(embeddings)
-
-    documents = []
-    for file in os.listdir(folder_path):
-        file_path = os.path.join(folder_path, file)
-        if file.endswith('.txt'):
-            loader = TextLoader(file_path)
-            docs = loader.load()
-        elif file.endswith(('.pdf', '.docx', '.pptx')):
-            # Unstructured handles PDFs, Word, PowerPoint, images, etc.
-            loader = UnstructuredFileLoader(file_path, mode="elements")
-            docs = loader.load()
-        else:
+    db = get_db(config["embedding_model"])
+    splitter = get_hierarchical_splitter(db.embeddings)
+
+    state = _load_manifest()
+    rebuild = state.get("embedding_model") != config["embedding_model"]
+    manifest = {} if rebuild else state.get("files", {})
+    current = set()
+    pending = {}
+    # A single directory read; DirEntry already carries name, type and stat
+    with os.scandir(folder_path) as it:
+        files = [
+            e for e in it
+            if e.is_file() and e.name.lower().endswith(SUPPORTED_EXTENSIONS)
+        ]
+    for e in files:
+        file_path = e.path
+        current.add(file_path)
+        entry = manifest.get(file_path)
+        mtime = e.stat().st_mtime
+        if entry and entry[0] == mtime:
             continue
-
-        try:
-            split_docs = splitter.split_documents(docs)
-            for d in split_docs:
-                d.page_content = d.page_content.strip()
-            documents.extend(split_docs)
-        except Exception as e:
-            print(f"Error processing {file}: {str(e)}")
+        digest = _sha256(file_path)
+        if entry and entry[1] == digest:
+            manifest[file_path] = [mtime, digest]
             continue
+        pending[file_path] = [mtime, digest]
+    removed = [p for p in manifest if p not in current]
+
+    # Loading and parsing is I/O bound, so files are processed concurrently
+    with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as ex:
+        futures = {ex.submit(_load_and_split, p, splitter): p for p in pending}
+        results = {futures[f]: f.result() for f in as_completed(futures)}
+    processed = [p for p, docs in results.items() if docs is not None]
+    documents = list(itertools.chain.from_iterable(results[p] for p in processed))
+
+    if processed or removed or rebuild:
+        if rebuild:
+            # The shared client picks up the new collection, so cached chains stay valid
+            db.reset_collection()
+        for file_path in processed + removed:
+            db.delete(where={"source": file_path})
+        # Similar-length chunks per batch keep padding on the Ollama side low
+        documents.sort(key=lambda d: len(d.page_content))
+        for i in range(0, len(documents), EMBED_BATCH_SIZE):
+            batch = documents[i:i + EMBED_BATCH_SIZE]
+            # add_texts embeds the whole batch with a single embed_documents call
+            db.add_texts(
+                texts=[d.page_content for d in batch],
+                metadatas=[d.metadata for d in batch],
+                ids=[uuid4().hex for _ in batch],
+            )
+
+    for file_path in processed:
+        manifest[file_path] = pending[file_path]
+    for file_path in removed:
+        del manifest[file_path]
+    _save_manifest({"embedding_model": config["embedding_model"], "files": manifest})
 
     if documents:
-        db = Chroma(persist_directory="./chroma_db", embedding_function=embeddings)
-        db.add_documents(documents)
-        return f"Ingested {len(documents)} chunks from {len(os.listdir(folder_path))} files!"
+        log_ingestion_metrics(documents, len(processed))
+        return f"Ingested {len(documents)} chunks from {len(processed)} files!"
+    if current and not pending:
+        return "All documents are already up to date."
     return "No valid documents found."